@@ -1,4 +1,17 @@
 # Bot commands module
+from src.controllers import summarizer_controller
+
+
+def setup(bot):
+    """Register the listeners this module needs on the bot."""
+    bot.add_listener(record_message, "on_message")
+
+
+async def record_message(message):
+    """Feed an incoming chat message into its channel's history."""
+    if message.author.bot or not message.content:
+        return
+    await summarizer_controller.record_messages(message.channel.id, [message.content])
 
 
 async def summarize_command(ctx, args):
@@ -7,7 +20,8 @@ async def summarize_command(ctx, args):
 
     if not args:
         # Generate a summary of the last messages
-        await generate_summary(ctx.channel.id)
+        summary = await generate_summary(ctx.channel.id)
+        await ctx.send(summary or "No messages recorded yet.")
         return
 
     # Handle other subcommands (e.g., status, reset, chat)
@@ -16,5 +30,4 @@ async def summarize_command(ctx, args):
 
 async def generate_summary(channel_id):
     """Generate a summary of the last messages in the specified channel."""
-    # Logic for generating a summary
-    # ...existing logic for summary generation...
+    return await summarizer_controller.generate_summary(channel_id)
@@ -10,6 +10,7 @@ SUMMARY_CONFIG = "summarizer_summary"
 CHANNEL_CONFIG = "summarizer_channel"
 MEMORY_LIMIT_CONFIG = "summarizer_memory_limit"
 MESSAGE_LIMIT_CONFIG = "summarizer_message_limit"
+SHARD_WORKERS_CONFIG = "summarizer_shard_workers"
 
 # Default configuration
 DEFAULT_MODEL = "deepseek/deepseek-chat-v3-0324:free"
@@ -1,10 +1,36 @@
 # Summarizer controller module
+import asyncio
 
+from src.core.shard_manager import get_shard_pool
 
-async def generate_summary(channel_id):
-    """Generate a summary of the last messages in the specified channel."""
-    # Logic for generating a summary
-    # ...existing logic...
+
+def _record(channel_id, messages):
+    return get_shard_pool().append_messages(channel_id, messages)
+
+
+def _summarize(channel_id, messages):
+    pool = get_shard_pool()
+    if messages:
+        pool.append_messages(channel_id, messages)
+    return pool.summarize(channel_id)
+
+
+async def record_messages(channel_id, messages):
+    """Store new messages for a channel on the worker that owns it."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _record, channel_id, list(messages))
+
+
+async def generate_summary(channel_id, messages=None):
+    """Generate a summary of the last messages in the specified channel.
+
+    Any ``messages`` given are added to the channel's history first. A
+    channel with no recorded messages yields an empty summary.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, _summarize, channel_id, list(messages or [])
+    )
 
 
 async def chat_with_full_logs(summary):
@@ -0,0 +1,509 @@
+"""Channel-sharded summarisation workers.
+
+Summarisation normally runs in whichever process received the request, so a
+single busy channel can starve every other one. This module places a small
+sharding layer in front of :func:`src.api.fetch_summary`: each channel ID is
+routed through a consistent hash ring to one of N long-lived worker
+processes. The worker owns that channel's recent messages and its cached
+summary, so per-channel state stays hot in a single process while the
+overall throughput scales across cores.
+
+Workers are started with the ``spawn`` method and talk to the coordinating
+process over :func:`multiprocessing.Pipe`. When a worker is added, only the
+channels whose position on the ring moves to the new worker are exported
+from their previous owner and imported into the new one. A worker that dies
+or stops answering is replaced in place; the state it held is lost and the
+affected request fails with :class:`WorkerUnavailableError`.
+
+Classes
+-------
+HashRing
+    Consistent hash ring mapping channel IDs to worker names.
+
+ShardPool
+    Owns the worker processes and routes requests to them.
+
+WorkerUnavailableError
+    Raised when a worker died or timed out while serving a request.
+
+Functions
+---------
+get_shard_pool() -> ShardPool
+    Return the process-wide pool, starting it from the configuration.
+
+shutdown_shard_pool() -> None
+    Stop the process-wide pool if it is running.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import multiprocessing
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from src import api
+from src.config.config_manager import (
+    DEFAULT_MESSAGE_LIMIT,
+    MESSAGE_LIMIT_CONFIG,
+    SHARD_WORKERS_CONFIG,
+    get_config_data,
+)
+
+# Number of virtual nodes placed on the ring for each worker. More replicas
+# give a more even spread of channels at the cost of a larger ring.
+DEFAULT_REPLICAS = 64
+# Seconds to wait for a worker reply before treating it as hung.
+DEFAULT_TIMEOUT = 30.0
+# Requests for channels sharing a stripe are serialised; see ShardPool.
+LOCK_STRIPES = 64
+
+# Forking a process that already runs threads (an asyncio loop, executor
+# threads) is unsafe, so workers are always spawned.
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+class WorkerUnavailableError(RuntimeError):
+    """A worker process died or stopped responding."""
+
+
+def _hash_key(key: str) -> int:
+    """Return a stable integer hash for ``key``.
+
+    Python's built-in :func:`hash` is salted per process, so a digest is used
+    instead to keep routing identical across restarts.
+    """
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes.
+
+    Parameters
+    ----------
+    nodes : Iterable[str], optional
+        Initial node names to place on the ring.
+    replicas : int, optional
+        Number of virtual nodes per real node, by default 64.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = DEFAULT_REPLICAS) -> None:
+        if replicas < 1:
+            raise ValueError("replicas must be at least 1")
+        self.replicas = replicas
+        self._keys: List[int] = []
+        self._owners: Dict[int, str] = {}
+        self._nodes: set[str] = set()
+        for node in nodes:
+            self.add_node(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        """Sorted list of the real nodes on the ring."""
+        return sorted(self._nodes)
+
+    def add_node(self, node: str) -> None:
+        """Place ``node`` and its virtual replicas on the ring."""
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for i in range(self.replicas):
+            point = _hash_key(f"{node}#{i}")
+            if point in self._owners:
+                continue
+            bisect.insort(self._keys, point)
+            self._owners[point] = node
+
+    def remove_node(self, node: str) -> None:
+        """Remove ``node`` and its virtual replicas from the ring."""
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        self._keys = [k for k in self._keys if self._owners[k] != node]
+        self._owners = {k: self._owners[k] for k in self._keys}
+
+    def get_node(self, key: Any) -> str:
+        """Return the node responsible for ``key``.
+
+        Raises
+        ------
+        LookupError
+            If the ring has no nodes.
+        """
+        if not self._keys:
+            raise LookupError("hash ring is empty")
+        idx = bisect.bisect(self._keys, _hash_key(str(key))) % len(self._keys)
+        return self._owners[self._keys[idx]]
+
+
+def _worker_main(conn: Any, message_limit: int) -> None:
+    """Serve requests for the channels owned by one worker process.
+
+    Each request is a ``(op, channel_id, payload)`` tuple and every request
+    receives exactly one ``(ok, result)`` reply.
+    """
+    histories: Dict[str, List[str]] = {}
+    summaries: Dict[str, str] = {}
+
+    while True:
+        try:
+            op, channel_id, payload = conn.recv()
+        except EOFError:
+            break
+        try:
+            if op == "stop":
+                conn.send((True, None))
+                break
+            if op == "append":
+                history = histories.setdefault(channel_id, [])
+                history.extend(payload)
+                if len(history) > message_limit:
+                    del history[: len(history) - message_limit]
+                summaries.pop(channel_id, None)
+                result: Any = len(history)
+            elif op == "summarize":
+                if payload is not None:
+                    result = api.fetch_summary(None, payload)
+                elif channel_id not in histories:
+                    result = ""
+                else:
+                    if channel_id not in summaries:
+                        summaries[channel_id] = api.fetch_summary(None, histories[channel_id])
+                    result = summaries[channel_id]
+            elif op == "export":
+                result = (histories.pop(channel_id, []), summaries.pop(channel_id, None))
+            elif op == "import":
+                history, summary = payload
+                histories[channel_id] = list(history)
+                if summary is not None:
+                    summaries[channel_id] = summary
+                result = None
+            elif op == "reset":
+                histories.pop(channel_id, None)
+                summaries.pop(channel_id, None)
+                result = None
+            else:
+                raise ValueError(f"Unknown operation: {op!r}")
+            conn.send((True, result))
+        except Exception as exc:
+            conn.send((False, f"{type(exc).__name__}: {exc}"))
+    conn.close()
+
+
+class _Worker:
+    """Handle on a worker process and the parent end of its pipe."""
+
+    def __init__(self, name: str, message_limit: int, timeout: float) -> None:
+        self.name = name
+        self.timeout = timeout
+        self.conn, child_conn = _CONTEXT.Pipe()
+        self.process = _CONTEXT.Process(
+            target=_worker_main,
+            args=(child_conn, message_limit),
+            name=f"summarizer-{name}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        # Pipes are not safe for concurrent use, so one request is in flight
+        # per worker at a time.
+        self.lock = threading.Lock()
+        self.retired = False
+
+    def request(self, op: str, channel_id: Optional[str] = None, payload: Any = None) -> Any:
+        """Send one request and wait for its reply.
+
+        Raises
+        ------
+        WorkerUnavailableError
+            If the process is dead or does not reply within ``timeout``.
+        RuntimeError
+            If the worker reported an error while handling the request.
+        """
+        with self.lock:
+            try:
+                if not self.process.is_alive():
+                    raise WorkerUnavailableError(f"Worker {self.name} is not running")
+                self.conn.send((op, channel_id, payload))
+                if not self.conn.poll(self.timeout):
+                    self.kill(wait=0)
+                    raise WorkerUnavailableError(
+                        f"Worker {self.name} did not reply within {self.timeout}s"
+                    )
+                ok, result = self.conn.recv()
+            except (EOFError, OSError) as exc:
+                raise WorkerUnavailableError(f"Worker {self.name} died: {exc}") from exc
+        if not ok:
+            raise RuntimeError(f"Worker {self.name} failed: {result}")
+        return result
+
+    def stop(self) -> None:
+        try:
+            self.request("stop")
+        except WorkerUnavailableError:
+            pass
+        self.kill()
+
+    def kill(self, wait: float = 5) -> None:
+        """Close the pipe and make sure the process is gone."""
+        self.conn.close()
+        self.process.join(timeout=wait)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+class ShardPool:
+    """Route per-channel summarisation to long-lived worker processes.
+
+    Requests for one channel are serialised by a striped lock that is held
+    across routing and the worker round-trip, so a channel being migrated
+    by :meth:`add_worker` never receives a request at its old owner after
+    its state was exported. The pool-wide lock only guards the ring and the
+    ownership map and is never held during IPC.
+
+    Parameters
+    ----------
+    num_workers : int, optional
+        Number of workers to start, by default the CPU count.
+    message_limit : int, optional
+        Maximum number of messages each worker keeps per channel, by
+        default 250.
+    replicas : int, optional
+        Virtual nodes per worker on the hash ring, by default 64.
+    timeout : float, optional
+        Seconds to wait for a worker reply, by default 30.
+    """
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        message_limit: int = DEFAULT_MESSAGE_LIMIT,
+        replicas: int = DEFAULT_REPLICAS,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        if num_workers is None:
+            num_workers = multiprocessing.cpu_count()
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        if message_limit < 1:
+            raise ValueError("message_limit must be at least 1")
+        self.message_limit = message_limit
+        self.timeout = timeout
+        self._ring = HashRing(replicas=replicas)
+        self._workers: Dict[str, _Worker] = {}
+        # Channels that hold state, mapped to the worker holding it.
+        self._channels: Dict[str, str] = {}
+        self._next_id = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._add_lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        try:
+            for _ in range(num_workers):
+                self.add_worker()
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def workers(self) -> List[str]:
+        """Names of the running workers."""
+        with self._lock:
+            return self._ring.nodes
+
+    @property
+    def channels(self) -> List[str]:
+        """Channel IDs that currently hold state in a worker."""
+        with self._lock:
+            return sorted(self._channels)
+
+    def worker_for(self, channel_id: Any) -> str:
+        """Return the name of the worker that owns ``channel_id``."""
+        key = str(channel_id)
+        with self._lock:
+            return self._channels.get(key) or self._ring.get_node(key)
+
+    def add_worker(self) -> str:
+        """Start a new worker and move the channels it now owns onto it.
+
+        Returns
+        -------
+        str
+            The name of the new worker.
+        """
+        with self._add_lock:
+            with self._lock:
+                self._check_open()
+                name = f"worker-{self._next_id}"
+                self._next_id += 1
+            worker = _Worker(name, self.message_limit, self.timeout)
+            with self._lock:
+                closed = self._closed
+                if not closed:
+                    self._workers[name] = worker
+                    self._ring.add_node(name)
+                    moved = [k for k, owner in self._channels.items()
+                             if self._ring.get_node(k) != owner]
+            if closed:
+                worker.stop()
+                self._check_open()
+            for key in moved:
+                try:
+                    self._migrate(key)
+                except RuntimeError:
+                    # The channel stays with its previous owner, or lost its
+                    # state along with a dead worker; either way it is
+                    # still routable.
+                    continue
+            return name
+
+    def _migrate(self, key: str) -> None:
+        """Move ``key``'s state to the worker the ring now assigns it to."""
+        with self._stripe(key):
+            with self._lock:
+                old = self._channels.get(key)
+                new = self._ring.get_node(key)
+                if old is None or old == new:
+                    return
+                old_worker, new_worker = self._workers[old], self._workers[new]
+            state = self._call(old_worker, "export", key)
+            try:
+                self._call(new_worker, "import", key, state)
+            except RuntimeError:
+                # Hand the state back so the channel keeps its history.
+                self._call(old_worker, "import", key, state)
+                raise
+            with self._lock:
+                self._channels[key] = new
+
+    def _stripe(self, key: str) -> threading.Lock:
+        return self._stripes[_hash_key(key) % len(self._stripes)]
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("ShardPool is closed")
+
+    def _owner(self, key: str) -> _Worker:
+        with self._lock:
+            self._check_open()
+            name = self._channels.get(key) or self._ring.get_node(key)
+            return self._workers[name]
+
+    def _call(self, worker: _Worker, op: str, key: Optional[str] = None, payload: Any = None) -> Any:
+        try:
+            return worker.request(op, key, payload)
+        except WorkerUnavailableError:
+            self._replace(worker)
+            raise
+
+    def _replace(self, worker: _Worker) -> None:
+        """Swap a dead worker for a fresh one under the same ring position."""
+        with self._lock:
+            if self._closed or worker.retired:
+                return
+            worker.retired = True
+            lost = [k for k, owner in self._channels.items() if owner == worker.name]
+            for key in lost:
+                del self._channels[key]
+        worker.kill(wait=0)
+        replacement = _Worker(worker.name, self.message_limit, self.timeout)
+        with self._lock:
+            if self._closed:
+                replacement.stop()
+            else:
+                self._workers[worker.name] = replacement
+
+    def append_messages(self, channel_id: Any, messages: Iterable[str]) -> int:
+        """Add messages to a channel's history and return its new length."""
+        key = str(channel_id)
+        payload = list(messages)
+        with self._stripe(key):
+            worker = self._owner(key)
+            result = self._call(worker, "append", key, payload)
+            with self._lock:
+                self._channels[key] = worker.name
+            return result
+
+    def summarize(self, channel_id: Any, messages: Optional[Iterable[str]] = None) -> str:
+        """Summarise a channel on its owning worker.
+
+        When ``messages`` is given they are summarised directly without
+        being stored; otherwise the worker summarises the history it holds
+        for the channel, reusing its cached summary if no messages arrived
+        since the last call. A channel with no history yields ``""``.
+        """
+        key = str(channel_id)
+        payload = list(messages) if messages is not None else None
+        with self._stripe(key):
+            return self._call(self._owner(key), "summarize", key, payload)
+
+    def reset_channel(self, channel_id: Any) -> None:
+        """Drop the history and cached summary held for ``channel_id``."""
+        key = str(channel_id)
+        with self._stripe(key):
+            self._call(self._owner(key), "reset", key)
+            with self._lock:
+                self._channels.pop(key, None)
+
+    def close(self) -> None:
+        """Stop every worker process."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers.values())
+            self._workers.clear()
+            self._channels.clear()
+            for node in self._ring.nodes:
+                self._ring.remove_node(node)
+        for worker in workers:
+            worker.stop()
+
+    def __enter__(self) -> "ShardPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+_pool: Optional[ShardPool] = None
+_pool_lock = threading.Lock()
+
+
+def _int_config(config: Dict[str, Any], key: str, default: Optional[int]) -> Optional[int]:
+    """Read an integer setting, accepting numeric strings."""
+    value = config.get(key, default)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Configuration value '{key}' must be an integer, got {value!r}")
+
+
+def get_shard_pool() -> ShardPool:
+    """Return the process-wide pool, starting it on first use.
+
+    Starting the pool reads the configuration and spawns the workers, so
+    async callers should reach this through an executor.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            config = get_config_data()
+            _pool = ShardPool(
+                num_workers=_int_config(config, SHARD_WORKERS_CONFIG, None),
+                message_limit=_int_config(config, MESSAGE_LIMIT_CONFIG, DEFAULT_MESSAGE_LIMIT),
+            )
+        return _pool
+
+
+def shutdown_shard_pool() -> None:
+    """Stop the process-wide pool if it is running."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -3,28 +3,41 @@
 This module abstracts the details of summarisation and health endpoints from
 higher‑level controllers. If in the future you wish to integrate with
 external services, this is the place to centralise those interactions. For
-now it simply delegates to the local summariser defined in :mod:`src.api`.
+now it delegates to the local summariser defined in :mod:`src.api`, routing
+per-channel requests through the worker pool in :mod:`src.core.shard_manager`.
 """
 
 from __future__ import annotations
 
-from typing import Iterable
+import asyncio
+from typing import Any, Iterable, Optional
 
 from src import api
+from src.core.shard_manager import get_shard_pool
 
 
-async def summarize_messages_async(messages: Iterable[str]) -> dict[str, str]:
+def _summarize_on_shard(channel_id: Any, messages: list[str]) -> str:
+    return get_shard_pool().summarize(channel_id, messages)
+
+
+async def summarize_messages_async(
+    messages: Iterable[str], channel_id: Optional[Any] = None
+) -> dict[str, str]:
     """Asynchronously summarise a collection of messages.
 
     Although the underlying summarisation is synchronous, this function is
     declared as asynchronous to allow seamless integration with async web
-    frameworks (e.g. aiohttp, FastAPI). It simply wraps the synchronous
-    call in an awaitable context.
+    frameworks (e.g. aiohttp, FastAPI). When a ``channel_id`` is given the
+    work runs on the worker process that owns the channel, reached through
+    an executor so the event loop is never blocked.
 
     Parameters
     ----------
     messages : Iterable[str]
         The chat messages to summarise.
+    channel_id : optional
+        The channel the messages belong to. Without one there is nothing to
+        shard on and the messages are summarised in this process.
 
     Returns
     -------
@@ -32,7 +45,12 @@ async def summarize_messages_async(messages: Iterable[str]) -> dict[str, str]:
         A dictionary containing the generated summary under the ``summary``
         key.
     """
-    summary = api.fetch_summary(None, messages)
+    if channel_id is None:
+        return {"summary": api.fetch_summary(None, messages)}
+    loop = asyncio.get_running_loop()
+    summary = await loop.run_in_executor(
+        None, _summarize_on_shard, channel_id, list(messages)
+    )
     return {"summary": summary}
 
 
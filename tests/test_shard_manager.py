@@ -0,0 +1,252 @@
+import asyncio
+import json
+import os
+import signal
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from api.index import handler
+from src.commands import bot_commands
+from src.controllers import summarizer_controller
+from src.core import shard_manager
+from src.core.shard_manager import HashRing, ShardPool, WorkerUnavailableError
+from src.services import api_service
+
+
+def test_hash_ring_is_stable_and_moves_few_keys():
+    ring = HashRing(["worker-0", "worker-1", "worker-2"])
+    keys = [str(i) for i in range(1000)]
+    before = {k: ring.get_node(k) for k in keys}
+    assert before == {k: ring.get_node(k) for k in keys}
+
+    ring.add_node("worker-3")
+    after = {k: ring.get_node(k) for k in keys}
+    moved = [k for k in keys if before[k] != after[k]]
+    assert all(after[k] == "worker-3" for k in moved)
+    assert 0 < len(moved) < len(keys) / 2
+
+
+def test_shard_pool_keeps_channel_state_across_rebalance():
+    with ShardPool(num_workers=2, message_limit=5) as pool:
+        channels = list(range(20))
+        for channel in channels:
+            pool.append_messages(channel, [f"channel {channel} message {i}" for i in range(7)])
+        summaries = {channel: pool.summarize(channel) for channel in channels}
+
+        pool.add_worker()
+        assert len(pool.workers) == 3
+        for channel in channels:
+            assert pool.summarize(channel) == summaries[channel]
+            assert pool.append_messages(channel, ["one more"]) == 5
+        assert "worker-2" in {pool.worker_for(c) for c in channels}
+
+
+@pytest.fixture
+def shared_pool(monkeypatch):
+    pool = ShardPool(num_workers=2)
+    monkeypatch.setattr(shard_manager, "_pool", pool)
+    yield pool
+    pool.close()
+
+
+def test_reset_and_one_off_summaries_do_not_keep_channels():
+    with ShardPool(num_workers=2) as pool:
+        pool.summarize("one-off", ["a message that is summarised once"])
+        assert pool.channels == []
+
+        pool.append_messages("kept", ["hello there", "the build is green"])
+        assert pool.channels == ["kept"]
+        pool.reset_channel("kept")
+        assert pool.channels == []
+        assert pool.summarize("kept") == ""
+
+
+def test_closed_pool_rejects_requests():
+    pool = ShardPool(num_workers=1)
+    pool.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.summarize("1", ["hello"])
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.add_worker()
+
+
+def test_worker_error_is_reported_and_worker_keeps_serving():
+    with ShardPool(num_workers=1) as pool:
+        with pytest.raises(RuntimeError, match="failed: AttributeError"):
+            pool.summarize("1", [1, 2, 3])
+        assert pool.summarize("1", ["still working"]) == "still working."
+
+
+def test_dead_worker_is_replaced():
+    with ShardPool(num_workers=1) as pool:
+        pool.append_messages("1", ["before the crash"])
+        worker = pool._workers[pool.worker_for("1")]
+        worker.process.kill()
+        worker.process.join()
+
+        with pytest.raises(WorkerUnavailableError):
+            pool.summarize("1")
+        assert pool.channels == []
+        assert pool.workers == ["worker-0"]
+        assert pool.append_messages("1", ["after the crash"]) == 1
+
+
+def test_concurrent_appends_survive_rebalance():
+    with ShardPool(num_workers=1) as pool:
+        channels = [str(i) for i in range(16)]
+
+        def append(channel):
+            for i in range(20):
+                pool.append_messages(channel, [f"message {i}"])
+
+        threads = [threading.Thread(target=append, args=(c,)) for c in channels]
+        for thread in threads:
+            thread.start()
+        pool.add_worker()
+        pool.add_worker()
+        for thread in threads:
+            thread.join()
+
+        for channel in channels:
+            assert pool.append_messages(channel, ["last"]) == 21
+
+
+def test_controller_summarises_recorded_messages(shared_pool):
+    async def run():
+        await summarizer_controller.record_messages(
+            42, ["hello there", "the build is green", "deploy at noon", "rollback plan ready"]
+        )
+        return await summarizer_controller.generate_summary(42)
+
+    summary = asyncio.run(run())
+    assert summary not in ("", ".")
+    assert "build is green" in summary
+    assert asyncio.run(summarizer_controller.generate_summary(43)) == ""
+
+
+def test_service_routes_channel_requests_through_pool(shared_pool):
+    result = asyncio.run(api_service.summarize_messages_async(["only message"], channel_id=7))
+    assert result == {"summary": "only message."}
+    assert shared_pool.channels == []
+
+
+def test_serverless_handler_stays_local(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    body = {"messages": ["first message", "second message"], "channel_id": 7}
+    response = handler({"httpMethod": "POST", "body": json.dumps(body)})
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["summary"] == "first message. second message."
+    assert shard_manager._pool is None
+    assert not (tmp_path / "config.json").exists()
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGSTOP"), reason="needs SIGSTOP")
+def test_hung_worker_times_out_and_is_replaced():
+    with ShardPool(num_workers=1, timeout=0.5) as pool:
+        worker = pool._workers["worker-0"]
+        os.kill(worker.process.pid, signal.SIGSTOP)
+
+        with pytest.raises(WorkerUnavailableError, match="did not reply"):
+            pool.summarize("1", ["hello"])
+        assert pool._workers["worker-0"] is not worker
+        assert pool.summarize("1", ["hello"]) == "hello."
+
+
+def test_failed_import_keeps_channel_on_previous_owner(monkeypatch):
+    with ShardPool(num_workers=1) as pool:
+        channels = [str(i) for i in range(16)]
+        for channel in channels:
+            pool.append_messages(channel, ["hello"])
+
+        call = pool._call
+
+        def failing_call(worker, op, key=None, payload=None):
+            if op == "import" and worker.name == "worker-1":
+                raise RuntimeError("import failed")
+            return call(worker, op, key, payload)
+
+        monkeypatch.setattr(pool, "_call", failing_call)
+        pool.add_worker()
+
+        assert pool.channels == sorted(channels)
+        assert {pool.worker_for(c) for c in channels} == {"worker-0"}
+        for channel in channels:
+            assert pool.append_messages(channel, ["again"]) == 2
+
+
+def test_failed_startup_stops_started_workers(monkeypatch):
+    with pytest.raises(ValueError, match="message_limit"):
+        ShardPool(num_workers=1, message_limit=0)
+
+    started = []
+    real_worker = shard_manager._Worker
+
+    def flaky_worker(*args):
+        if started:
+            raise OSError("spawn failed")
+        started.append(real_worker(*args))
+        return started[-1]
+
+    monkeypatch.setattr(shard_manager, "_Worker", flaky_worker)
+    with pytest.raises(OSError, match="spawn failed"):
+        ShardPool(num_workers=3)
+    assert len(started) == 1
+    assert not started[0].process.is_alive()
+
+
+class _Channel:
+    id = 42
+
+
+class _Author:
+    bot = False
+
+
+class _Message:
+    def __init__(self, content):
+        self.content = content
+        self.channel = _Channel()
+        self.author = _Author()
+
+    async def delete(self):
+        pass
+
+
+class _Context:
+    def __init__(self):
+        self.channel = _Channel()
+        self.message = _Message("!summarize")
+        self.sent = []
+
+    async def send(self, text):
+        self.sent.append(text)
+
+
+class _Bot:
+    def __init__(self):
+        self.listeners = {}
+
+    def add_listener(self, func, name):
+        self.listeners[name] = func
+
+
+def test_bot_records_messages_and_sends_summary(shared_pool):
+    bot = _Bot()
+    bot_commands.setup(bot)
+    on_message = bot.listeners["on_message"]
+
+    async def run():
+        ctx = _Context()
+        await bot_commands.summarize_command(ctx, [])
+        for text in ["hello there", "the build is green", "deploy at noon"]:
+            await on_message(_Message(text))
+        await bot_commands.summarize_command(ctx, [])
+        return ctx.sent
+
+    sent = asyncio.run(run())
+    assert sent == ["No messages recorded yet.", "hello there. the build is green. deploy at noon."]